@@ -0,0 +1,178 @@
+# llm_cache.py
+
+# Import required libraries
+import collections
+import functools
+import hashlib
+import json
+import threading
+import time
+
+import diskcache
+import faiss
+import numpy as np
+from openai import BadRequestError, NotFoundError, OpenAIError
+
+# ------------------- CONFIGURATION -------------------
+CACHE_DIR = "./.llm_cache"
+CACHE_TTL = 7 * 24 * 60 * 60  # 7 days, in seconds
+HOT_CACHE_SIZE = 256
+EMBEDDING_MODEL = "text-embedding-3-small"
+SIMILARITY_THRESHOLD = 0.93
+SEMANTIC_CACHE_SIZE = 256  # (video_id, model) indexes kept in memory
+PROMPTS_PER_VIDEO = 16  # prompt variants remembered per index
+
+
+# ------------------- EXACT-MATCH CACHE -------------------
+class LLMCache:
+    """Caches chat completion texts keyed on (model, messages, temperature).
+
+    Entries are persisted on disk so they survive Streamlit reruns and restarts,
+    with an in-process LRU layer in front of the disk for hot hits.
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl=CACHE_TTL, hot_size=HOT_CACHE_SIZE):
+        self._disk = diskcache.Cache(directory)
+        self._ttl = ttl
+        # key -> (value, expire_time); the hot layer honours the same TTL as the disk
+        self._hot = collections.OrderedDict()
+        self._hot_size = hot_size
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model, messages, temperature):
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key, value, expire_time):
+        with self._lock:
+            self._hot[key] = (value, expire_time)
+            self._hot.move_to_end(key)
+            while len(self._hot) > self._hot_size:
+                self._hot.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._hot.pop(key, None)
+            if entry is not None and entry[1] > time.time():
+                self._hot[key] = entry
+                self.hits += 1
+                return entry[0]
+        value, expire_time = self._disk.get(key, expire_time=True)
+        if value is None:
+            self.misses += 1
+            return None
+        self._remember(key, value, expire_time)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        # An empty completion is a failed call, not an answer worth serving again
+        if not value:
+            return
+        self._disk.set(key, value, expire=self._ttl)
+        self._remember(key, value, time.time() + self._ttl)
+
+
+# ------------------- SEMANTIC CACHE -------------------
+class SemanticCache:
+    """Serves stored results for near-duplicate prompts on the same video.
+
+    Prompts are embedded and kept in one inner-product FAISS index per
+    (video_id, model); with normalized vectors the score is cosine similarity.
+    The indexes are LRU-bounded and entries expire like those of LLMCache.
+    """
+
+    def __init__(self, client, threshold=SIMILARITY_THRESHOLD, hot_size=HOT_CACHE_SIZE,
+                 ttl=CACHE_TTL, max_entries=SEMANTIC_CACHE_SIZE, prompts_per_video=PROMPTS_PER_VIDEO):
+        self._client = client
+        self._threshold = threshold
+        self._ttl = ttl
+        # (video_id, model) -> (index, [(value, expire_time), ...]), least recently used first
+        self._entries = collections.OrderedDict()
+        self._max_entries = max_entries
+        self._prompts_per_video = prompts_per_video
+        self._lock = threading.Lock()
+        self._embed = functools.lru_cache(maxsize=hot_size)(self._embed_prompt)
+        # Public so other embedding users can share the chat-only-server switch-off
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+
+    def _embed_prompt(self, prompt):
+        response = self._client.embeddings.create(model=EMBEDDING_MODEL, input=prompt)
+        vector = np.array([response.data[0].embedding], dtype="float32")
+        faiss.normalize_L2(vector)
+        return vector
+
+    def _vector(self, prompt):
+        if not self.enabled:
+            return None
+        try:
+            return self._embed(prompt)
+        except (NotFoundError, BadRequestError):
+            # Servers without an embeddings endpoint (e.g. a chat-only vLLM) turn the cache off
+            self.enabled = False
+        except OpenAIError:
+            pass
+        return None
+
+    def has_entries(self, video_id, model):
+        # Cheap pre-check without an embeddings request: False means get() cannot hit
+        if not self.enabled:
+            return False
+        with self._lock:
+            return self._live_entry((video_id, model)) is not None
+
+    def get(self, video_id, model, prompt):
+        vector = self._vector(prompt)
+        if vector is None:
+            return None
+        with self._lock:
+            entry = self._live_entry((video_id, model))
+            if entry is not None:
+                index, values = entry
+                scores, ids = index.search(vector, 1)
+                if scores[0][0] >= self._threshold:
+                    value, expire_time = values[ids[0][0]]
+                    if expire_time > time.time():
+                        self.hits += 1
+                        return value
+            self.misses += 1
+            return None
+
+    def set(self, video_id, model, prompt, value):
+        vector = self._vector(prompt)
+        if vector is None:
+            return
+        with self._lock:
+            entry = self._live_entry((video_id, model))
+            if entry is None:
+                entry = (faiss.IndexFlatIP(vector.shape[1]), [])
+                self._entries[(video_id, model)] = entry
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+            index, values = entry
+            index.add(vector)
+            values.append((value, time.time() + self._ttl))
+            if len(values) > self._prompts_per_video:
+                # IndexFlat renumbers after a removal, so dropping id 0 keeps ids aligned with values
+                index.remove_ids(np.array([0], dtype="int64"))
+                values.pop(0)
+
+    def _live_entry(self, key):
+        # Callers hold the lock. Values are appended in expiry order, so an index whose newest
+        # value has expired holds nothing servable and is dropped
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1][-1][1] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
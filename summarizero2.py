@@ -3,33 +3,248 @@
 # Import required libraries
 import streamlit as st
 from youtube_transcript_api import YouTubeTranscriptApi
-from urllib.parse import urlparse, parse_qs
-from openai import OpenAI
+from youtube_transcript_api._errors import RequestBlocked, YouTubeRequestFailed
+from youtube_transcript_api.proxies import GenericProxyConfig
+from requests import HTTPError, Session
+from requests.exceptions import ConnectionError as RequestConnectionError, Timeout
+from requests.adapters import HTTPAdapter
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
+from openai import OpenAI, AsyncOpenAI, BadRequestError, NotFoundError, OpenAIError
 from dotenv import load_dotenv
+from llm_cache import EMBEDDING_MODEL, LLMCache, SemanticCache
+import asyncio
+import faiss
+import httpx
+import math
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 import os
+import re
+import threading
+import tiktoken
 
 # ------------------- LOAD ENVIRONMENT VARIABLES -------------------
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=openai_api_key)
+
+# OPENAI_BASE_URL points the app at any OpenAI-compatible server instead of api.openai.com,
+# and OPENAI_MODEL names the model it serves (it becomes the default choice). For example a
+# quantized model on vLLM, whose prefix caching reuses the shared prompt prefix across calls:
+#   vllm serve Qwen/Qwen2.5-7B-Instruct --quantization fp8 --enable-prefix-caching
+#   OPENAI_BASE_URL=http://localhost:8000/v1 OPENAI_MODEL=Qwen/Qwen2.5-7B-Instruct OPENAI_API_KEY=EMPTY
+openai_base_url = os.getenv("OPENAI_BASE_URL")
+custom_model = os.getenv("OPENAI_MODEL")
+custom_context_window = os.getenv("OPENAI_CONTEXT_WINDOW")
+
+# Connection pool limits and timeout shared by the sync and async OpenAI clients
+HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+HTTP_TIMEOUT = 60.0
+
+# Keep the client, and with it the httpx keep-alive pool, alive across Streamlit reruns
+@st.cache_resource
+def get_client():
+    return OpenAI(
+        api_key=openai_api_key,
+        base_url=openai_base_url,
+        http_client=httpx.Client(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    )
+
+# An async client's pool is bound to the event loop it runs on, so it cannot be cached across
+# asyncio.run calls like get_client; each loop opens one with the same limits and timeout
+def get_async_client():
+    return AsyncOpenAI(
+        api_key=openai_api_key,
+        base_url=openai_base_url,
+        http_client=httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    )
+
+client = get_client()
+
+@st.cache_resource
+def get_llm_cache():
+    return LLMCache()
+
+llm_cache = get_llm_cache()
+
+@st.cache_resource
+def get_semantic_cache():
+    return SemanticCache(client)
+
+semantic_cache = get_semantic_cache()
+
+# One pooled keep-alive session for all transcript fetches, shared across reruns.
+# Retries live only in the tenacity layer around the fetch, so 429s still reach the
+# library (which reports them as IpBlocked) and a throttled fetch is not retried twice over.
+# YouTubeTranscriptApi writes its proxies onto the session, so each proxy setting gets its own.
+@st.cache_resource
+def get_http_session(proxies):
+    session = Session()
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+    return session
+
+@st.cache_resource
+def get_proxies():
+    return (os.getenv("HTTP_PROXY"), os.getenv("HTTPS_PROXY"))
+
+# YouTubeTranscriptApi is not thread-safe and batch fetches run on several worker threads at once,
+# so each thread builds its own instances on top of the shared pooled sessions
+@st.cache_resource
+def get_transcript_apis():
+    return threading.local()
+
+def get_transcript_api(proxies):
+    apis = get_transcript_apis()
+    if not hasattr(apis, "by_proxies"):
+        apis.by_proxies = {}
+    if proxies not in apis.by_proxies:
+        proxy_config = None
+        if any(proxies):
+            proxy_config = GenericProxyConfig(http_url=proxies[0], https_url=proxies[1])
+        apis.by_proxies[proxies] = YouTubeTranscriptApi(proxy_config=proxy_config, http_client=get_http_session(proxies))
+    return apis.by_proxies[proxies]
+
+MODELS = ["gpt-3.5-turbo", "gpt-4"]
+if custom_model:
+    # A built-in model named in OPENAI_MODEL moves to the front instead of being listed twice
+    if custom_model in MODELS:
+        MODELS.remove(custom_model)
+    MODELS.insert(0, custom_model)
+
+class ApproximateEncoding:
+    # Stand-in when tiktoken cannot download its BPE files (e.g. offline or self-hosted setups):
+    # pieces of up to four characters, about one token each, that join back into the text
+    _PIECE_RE = re.compile(r"\s*\S{1,4}")
+
+    def encode(self, text):
+        return self._PIECE_RE.findall(text)
+
+    def decode(self, ids):
+        return "".join(ids)
+
+def load_encoding(model):
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            # Non-OpenAI models have their own tokenizers; cl100k_base is a close enough estimate
+            return tiktoken.get_encoding("cl100k_base")
+    except (OSError, ValueError):
+        # Download failures surface as requests errors (OSError) or a hash mismatch (ValueError)
+        return ApproximateEncoding()
+
+# Tokenizers are loaded once per process instead of on every request
+@st.cache_resource
+def get_encodings():
+    return {model: load_encoding(model) for model in MODELS}
+
+_ENC = get_encodings()
+
+# Transcripts too long for one request are split into overlapping token windows summarized concurrently
+CHUNK_TOKENS = 3000
+CHUNK_OVERLAP = 200
+CHUNK_MAX_TOKENS = 400
+MAX_CONCURRENT_REQUESTS = 8
+
+# Whatever is sent alongside the transcript must fit in the model's context window
+CONTEXT_WINDOWS = {"gpt-3.5-turbo": 16385, "gpt-4": 8192}
+if custom_model:
+    if custom_context_window:
+        CONTEXT_WINDOWS[custom_model] = int(custom_context_window)
+    else:
+        # Built-in models keep their known window; unknown ones default to 32k
+        CONTEXT_WINDOWS.setdefault(custom_model, 32768)
+SUMMARY_MAX_TOKENS = 800
+PROMPT_RESERVE = 1000  # system prompt, instructions and the user's prompt or question
+CHUNKED_SOURCE = "a set of summaries of consecutive parts of the video"
+
+# Q&A retrieves the most relevant short transcript passages instead of sending the whole context
+PASSAGE_WORDS = 30  # roughly 40 tokens
+RETRIEVAL_TOP_K = 5
+EMBEDDING_BATCH_SIZE = 2048  # maximum inputs per embeddings request
+
+# Shared by the summary and Q&A calls so both start with the same prompt prefix
+SYSTEM_PROMPT = "You are an assistant that helps people understand and learn from YouTube videos. Base your answers on the video content provided."
+SUMMARY_INSTRUCTIONS = "Based on the video content above, generate a structured summary for educational and knowledge purposes. Break it down into:Objective Required Tools/Inputs (if any) Key Steps or Concepts Sub-tasks or Techniques (if applicable) Dependencies or Prerequisites Potential Pitfalls or Common Mistakes Make the summary clear, concise, and easy to follow, ideal for someone trying to learn or apply the knowledge."
 
 # ------------------- HELPER FUNCTIONS -------------------
+def cached_chat_completion(model, messages, temperature, max_tokens, placeholder=None):
+    key = LLMCache.make_key(model, messages, temperature)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        return cached
+    response = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True
+    )
+    # Render tokens as they arrive instead of waiting for the full completion
+    buf = ""
+    for chunk in response:
+        if not chunk.choices:
+            continue
+        buf += chunk.choices[0].delta.content or ""
+        if placeholder is not None:
+            placeholder.markdown(buf)
+    llm_cache.set(key, buf)
+    return buf
+
+async def cached_chat_completion_async(aclient, model, messages, temperature, max_tokens, placeholder=None):
+    key = LLMCache.make_key(model, messages, temperature)
+    # Cache reads and writes hit the disk, so keep them off the event loop while other calls stream
+    cached = await asyncio.to_thread(llm_cache.get, key)
+    if cached is not None:
+        return cached
+    response = await aclient.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True
+    )
+    buf = ""
+    async for chunk in response:
+        if not chunk.choices:
+            continue
+        buf += chunk.choices[0].delta.content or ""
+        if placeholder is not None:
+            placeholder.markdown(buf)
+    await asyncio.to_thread(llm_cache.set, key, buf)
+    return buf
+
+# Matches youtu.be links as well as watch, embed, v and shorts URLs on youtube.com
+_VID_RE = re.compile(r"(?:youtu\.be/|youtube\.com/(?:watch\?(?:.*&)?v=|embed/|v/|shorts/))([\w-]{11})")
+
 def extract_video_id(url):
-    parsed_url = urlparse(url)
-    if parsed_url.hostname == 'youtu.be':
-        return parsed_url.path[1:]
-    elif parsed_url.hostname in ['www.youtube.com', 'youtube.com']:
-        return parse_qs(parsed_url.query).get('v', [None])[0]
-    return None
-
-def fetch_transcript(video_id):
+    m = _VID_RE.search(url)
+    return m.group(1) if m else None
+
+def is_transient_transcript_error(error):
+    # IpBlocked (a RequestBlocked) is what the library raises for HTTP 429
+    if isinstance(error, RequestBlocked):
+        return True
+    if isinstance(error, YouTubeRequestFailed):
+        # Only server errors are worth retrying; other 4xx responses will not change
+        http_error = error.__context__
+        return isinstance(http_error, HTTPError) and http_error.response is not None and http_error.response.status_code >= 500
+    return isinstance(error, (RequestConnectionError, Timeout))
+
+@retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(multiplier=1, min=1, max=30),
+    retry=retry_if_exception(is_transient_transcript_error),
+    reraise=True
+)
+def fetch_transcript_text(video_id, proxies):
+    transcript_list = get_transcript_api(proxies).fetch(video_id)
+    return " ".join(text for snippet in transcript_list if (text := snippet.text))
+
+@st.cache_data(ttl=86400, max_entries=256, show_spinner=False)
+def fetch_transcript(video_id, proxies):
+    # proxies is an (http, https) tuple passed in explicitly so it is part of the cache key
     try:
-        proxy = {
-            "http": os.getenv("HTTP_PROXY"),
-            "https": os.getenv("HTTPS_PROXY")
-        }
-        transcript_list = YouTubeTranscriptApi.get_transcript(video_id, proxies=proxy)
-        return " ".join([entry['text'] for entry in transcript_list])
+        return fetch_transcript_text(video_id, proxies)
     except Exception as e:
         raise RuntimeError(
             f"Could not retrieve transcript. This may be due to:\n"
@@ -39,40 +254,206 @@ def fetch_transcript(video_id):
             f"Technical error: {str(e)}"
         )
 
-def generate_summary(prompt, transcript, model="gpt-3.5-turbo"):
-    full_prompt = (
-        f"{prompt}\n\n"
-        f"Here is the transcript of the video:\n{transcript}\n\n"
-        f"Generate a compact, descriptive summary with key points."
-    )
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": "Watch the following YouTube video. Based on its content, generate a structured summary for educational and knowledge purposes. Break it down into:Objective Required Tools/Inputs (if any) Key Steps or Concepts Sub-tasks or Techniques (if applicable) Dependencies or Prerequisites Potential Pitfalls or Common Mistakes Make the summary clear, concise, and easy to follow, ideal for someone trying to learn or apply the knowledge."},
-            {"role": "user", "content": full_prompt}
-        ],
-        temperature=0.5,
-        max_tokens=800
-    )
-    return response.choices[0].message.content
-
-def answer_question_from_summary(summary, question, model="gpt-3.5-turbo"):
-    question_prompt = (
-        f"Based on the following summary of a YouTube video, answer the question:\n\n"
-        f"Summary: {summary}\n\n"
-        f"Question: {question}\n"
-        f"Answer clearly and concisely."
-    )
-    response = client.chat.completions.create(
+# Spoken filler that carries no content. "you know" and "I mean" only count as filler when
+# they stand alone between commas or sentence breaks ("do you know", "what I mean is" are kept);
+# "like" is left alone since it is usually meaningful
+_FILLER_RE = re.compile(r"\b(?:uh|um)\b,?|(?:^|(?<=[,.!?]))\s*(?:you know|I mean)\s*(?:,|(?=[.!?]|$))", re.I)
+
+def compress_transcript(transcript):
+    # split() also collapses runs of whitespace left behind by the filler removal
+    words = _FILLER_RE.sub(" ", transcript).split()
+    kept = []
+    for word in words:
+        kept.append(word)
+        # Auto-captions often repeat the previous phrase; drop a trigram that repeats the one before it
+        if len(kept) >= 6 and kept[-3:] == kept[-6:-3]:
+            del kept[-3:]
+    return " ".join(kept)
+
+def count_tokens(text, model):
+    return len(_ENC[model].encode(text))
+
+def fit_to_budget(text, model, budget):
+    if budget <= 0:
+        raise ValueError(f"Token budget must be positive, got {budget}.")
+    ids = _ENC[model].encode(text)
+    if len(ids) <= budget:
+        return text
+    # Keep the head and the tail, which usually carry the setup and the conclusions
+    head, tail = int(0.6 * budget), int(0.3 * budget)
+    ids = ids[:head] + _ENC[model].encode(" ... ") + ids[len(ids) - tail:]
+    return _ENC[model].decode(ids)
+
+def context_budget(model):
+    budget = CONTEXT_WINDOWS[model] - SUMMARY_MAX_TOKENS - PROMPT_RESERVE
+    if budget <= 0:
+        raise ValueError(
+            f"The context window of {model} ({CONTEXT_WINDOWS[model]} tokens) is too small; "
+            f"it needs more than {SUMMARY_MAX_TOKENS + PROMPT_RESERVE} tokens. Check OPENAI_CONTEXT_WINDOW."
+        )
+    return budget
+
+def chunk_tokens(model):
+    # Each map request must also fit in the model's window, not just the summary request
+    return min(CHUNK_TOKENS, CONTEXT_WINDOWS[model] - CHUNK_MAX_TOKENS - PROMPT_RESERVE)
+
+def split_transcript(transcript, model):
+    ids = _ENC[model].encode(transcript)
+    # Only transcripts that do not fit in a single summary request are map-reduced
+    if len(ids) <= context_budget(model):
+        return [transcript]
+    # Spread the tokens evenly over as few windows as possible so no window is mostly overlap
+    count = math.ceil((len(ids) - CHUNK_OVERLAP) / (chunk_tokens(model) - CHUNK_OVERLAP))
+    step = math.ceil((len(ids) - CHUNK_OVERLAP) / count)
+    return [
+        _ENC[model].decode(ids[start:start + step + CHUNK_OVERLAP])
+        for start in range(0, step * count, step)
+    ]
+
+async def summarize_chunks(aclient, semaphore, chunks, model):
+    async def summarize_chunk(chunk):
+        messages = [
+            {"role": "system", "content": "Summarize this part of a YouTube video transcript. Keep the key points, steps, and important details."},
+            {"role": "user", "content": chunk}
+        ]
+        async with semaphore:
+            return await cached_chat_completion_async(
+                aclient,
+                model=model,
+                messages=messages,
+                temperature=0.5,
+                max_tokens=CHUNK_MAX_TOKENS
+            )
+
+    return await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks))
+
+async def summarize_long_transcript(chunks, model):
+    # The async client is scoped to this event loop; asyncio.run closes the loop afterwards
+    async with get_async_client() as aclient:
+        return await summarize_chunks(aclient, asyncio.Semaphore(MAX_CONCURRENT_REQUESTS), chunks, model)
+
+def build_messages_template(prompt):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"{SUMMARY_INSTRUCTIONS}\n\n{prompt}\n\nGenerate a compact, descriptive summary with key points."}
+    ]
+
+def build_context_message(transcript, model, source="the transcript of the video"):
+    # The budget does not depend on the prompt, so the block is byte-identical across summary calls and
+    # for Q&A when no passage index is available
+    return {"role": "system", "content": f"Here is {source}:\n{fit_to_budget(transcript, model, context_budget(model))}"}
+
+def build_summary_messages(messages_template, context_message):
+    system_message, prompt_message = messages_template
+    # Invariant content first: the system prompt and video context form a shared prefix, so
+    # prefix-caching backends only prefill the trailing prompt
+    return [system_message, context_message, prompt_message]
+
+def prepare_context(transcript, model):
+    chunks = split_transcript(transcript, model)
+    if len(chunks) == 1:
+        return build_context_message(transcript, model)
+    # Map: summarize every window concurrently; the summary call then reduces them
+    partial_summaries = asyncio.run(summarize_long_transcript(chunks, model))
+    return build_context_message("\n\n".join(partial_summaries), model, CHUNKED_SOURCE)
+
+def generate_summary(messages_template, context_message, model="gpt-3.5-turbo", placeholder=None):
+    return cached_chat_completion(
         model=model,
-        messages=[
-            {"role": "system", "content": "You are an assistant that answers questions based on video summaries."},
-            {"role": "user", "content": question_prompt}
-        ],
+        messages=build_summary_messages(messages_template, context_message),
         temperature=0.5,
-        max_tokens=400
+        max_tokens=SUMMARY_MAX_TOKENS,
+        placeholder=placeholder
     )
-    return response.choices[0].message.content
+
+def embed_texts(texts):
+    vectors = []
+    for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+        response = client.embeddings.create(model=EMBEDDING_MODEL, input=texts[start:start + EMBEDDING_BATCH_SIZE])
+        vectors.extend(item.embedding for item in response.data)
+    vectors = np.array(vectors, dtype="float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+def build_passage_index(transcript):
+    # Auto-captions are mostly unpunctuated, so passages are fixed-size word windows, not sentences
+    words = transcript.split()
+    passages = [" ".join(words[start:start + PASSAGE_WORDS]) for start in range(0, len(words), PASSAGE_WORDS)]
+    if not passages or not semantic_cache.enabled:
+        return None
+    try:
+        vectors = embed_texts(passages)
+    except (NotFoundError, BadRequestError):
+        # Without an embeddings endpoint Q&A falls back to the shared video context; the semantic
+        # cache shares the flag, so neither sends embeddings requests again
+        semantic_cache.enabled = False
+        return None
+    except OpenAIError:
+        return None
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+    return index, passages
+
+def build_question_context(passage_index, context_message, question):
+    if passage_index is None:
+        return context_message
+    index, passages = passage_index
+    try:
+        _, ids = index.search(embed_texts([question]), RETRIEVAL_TOP_K)
+    except OpenAIError:
+        return context_message
+    # Keep transcript order so the passages read in sequence
+    relevant = "\n".join(f"- {passages[i]}" for i in sorted(ids[0]) if i >= 0)
+    return {"role": "system", "content": f"Here are the most relevant passages from the video transcript:\n{relevant}"}
+
+async def summarize_video(aclient, semaphore, url, prompt, model, proxies):
+    video_id = extract_video_id(url)
+    if not video_id:
+        raise ValueError("Invalid YouTube URL format.")
+    cached = await asyncio.to_thread(semantic_cache.get, video_id, model, prompt)
+    if cached is not None:
+        return cached[0]
+    transcript = compress_transcript(await asyncio.to_thread(fetch_transcript, video_id, proxies))
+    chunks = split_transcript(transcript, model)
+    if len(chunks) == 1:
+        context_message = build_context_message(transcript, model)
+    else:
+        partial_summaries = await summarize_chunks(aclient, semaphore, chunks, model)
+        context_message = build_context_message("\n\n".join(partial_summaries), model, CHUNKED_SOURCE)
+    async with semaphore:
+        summary = await cached_chat_completion_async(
+            aclient,
+            model=model,
+            messages=build_summary_messages(build_messages_template(prompt), context_message),
+            temperature=0.5,
+            max_tokens=SUMMARY_MAX_TOKENS
+        )
+    await asyncio.to_thread(semantic_cache.set, video_id, model, prompt, (summary, context_message, transcript))
+    return summary
+
+async def summarize_videos(urls, prompt, model, proxies):
+    # Only the LLM calls take the semaphore; transcript fetches are bounded by the to_thread pool
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    async with get_async_client() as aclient:
+        return await asyncio.gather(
+            *(summarize_video(aclient, semaphore, url, prompt, model, proxies) for url in urls),
+            return_exceptions=True
+        )
+
+async def answer_question(context_message, question, model="gpt-3.5-turbo", placeholder=None):
+    async with get_async_client() as aclient:
+        return await cached_chat_completion_async(
+            aclient,
+            model=model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                context_message,
+                {"role": "user", "content": f"Answer this question about the video clearly and concisely:\n{question}"}
+            ],
+            temperature=0.5,
+            max_tokens=400,
+            placeholder=placeholder
+        )
 
 # ------------------- STREAMLIT UI -------------------
 st.title("📽️ YouTube Video Summarizer & Q&A")
@@ -83,9 +464,9 @@ to generate a **clean and focused summary** with key points.
 You can also **ask questions** about the video content!
 """)
 
-youtube_url = st.text_input("🔗 YouTube Video URL")
+youtube_urls = st.text_area("🔗 YouTube Video URL(s)", help="Enter one URL per line to summarize several videos at once.")
 user_prompt = st.text_area("✍️ Your Prompt", "Summarize this video for a blog post.")
-selected_model = st.selectbox("🤖 Choose Model", ["gpt-3.5-turbo", "gpt-4"])
+selected_model = st.selectbox("🤖 Choose Model", MODELS)
 
 if "summary" not in st.session_state:
     st.session_state.summary = ""
@@ -93,19 +474,77 @@ if "qa_active" not in st.session_state:
     st.session_state.qa_active = False
 if "qa_history" not in st.session_state:
     st.session_state.qa_history = []
+if "qa_memo" not in st.session_state:
+    st.session_state.qa_memo = {}
+if "context_message" not in st.session_state:
+    st.session_state.context_message = None
+if "transcript" not in st.session_state:
+    st.session_state.transcript = None
+if "passage_index" not in st.session_state:
+    st.session_state.passage_index = None
 
 if st.button("🚀 Generate Summary"):
-    if not youtube_url.strip():
+    urls = [line.strip() for line in youtube_urls.splitlines() if line.strip()]
+    if not urls:
         st.warning("Please enter a YouTube video URL.")
+    elif len(urls) > 1:
+        with st.spinner(f"Fetching transcripts and generating summaries for {len(urls)} videos..."):
+            results = asyncio.run(summarize_videos(urls, user_prompt, selected_model, get_proxies()))
+        sections = []
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                st.error(f"❌ {url}: {result}")
+            else:
+                sections.append(f"**{url}**\n\n{result}")
+        if sections:
+            # The combined summary backs the Q&A below, so questions can span all videos
+            st.session_state.summary = "\n\n---\n\n".join(sections)
+            # Many summaries together can exceed the model's window, so they get the same token budget as a transcript
+            st.session_state.context_message = build_context_message(st.session_state.summary, selected_model, "a set of summaries of several videos")
+            st.session_state.transcript = None
+            st.session_state.passage_index = None
+            st.session_state.qa_memo = {}
+            st.session_state.qa_active = True
     else:
+        youtube_url = urls[0]
         try:
             video_id = extract_video_id(youtube_url)
             if not video_id:
                 st.error("Invalid YouTube URL format.")
             else:
                 with st.spinner("Fetching transcript and generating summary..."):
-                    transcript = fetch_transcript(video_id)
-                    st.session_state.summary = generate_summary(user_prompt, transcript, model=selected_model)
+                    proxies = get_proxies()
+                    # With no semantic-cache entries for this video a hit is impossible, so the transcript
+                    # fetch overlaps the prompt embedding. Otherwise it waits for a miss, so that a hit
+                    # never sends a YouTube request
+                    transcript_future = None
+                    if not semantic_cache.has_entries(video_id, selected_model):
+                        executor = ThreadPoolExecutor(max_workers=1)
+                        transcript_future = executor.submit(fetch_transcript, video_id, proxies)
+                        executor.shutdown(wait=False)
+                    # Near-duplicate prompts on the same video reuse an earlier summary
+                    cached = semantic_cache.get(video_id, selected_model, user_prompt)
+                    if cached is not None:
+                        summary, context_message, transcript = cached
+                    else:
+                        raw_transcript = transcript_future.result() if transcript_future else fetch_transcript(video_id, proxies)
+                        messages_template = build_messages_template(user_prompt)
+                        transcript = compress_transcript(raw_transcript)
+                        st.sidebar.caption(
+                            f"✂️ Transcript: {count_tokens(raw_transcript, selected_model)} → "
+                            f"{count_tokens(transcript, selected_model)} tokens"
+                        )
+                        summary_placeholder = st.empty()
+                        context_message = prepare_context(transcript, selected_model)
+                        summary = generate_summary(messages_template, context_message, model=selected_model, placeholder=summary_placeholder)
+                        summary_placeholder.empty()
+                        semantic_cache.set(video_id, selected_model, user_prompt, (summary, context_message, transcript))
+                    st.session_state.summary = summary
+                    st.session_state.context_message = context_message
+                    st.session_state.transcript = transcript
+                    # Built on the first question, so summaries nobody asks about skip the embeddings
+                    st.session_state.passage_index = None
+                    st.session_state.qa_memo = {}
                     st.session_state.qa_active = True
         except RuntimeError as e:
             st.error(f"❌ {e}")
@@ -125,8 +564,26 @@ if st.session_state.qa_active and st.session_state.summary:
 
     if submit_question and user_question.strip():
         with st.spinner("Thinking..."):
-            answer = answer_question_from_summary(st.session_state.summary, user_question, model=selected_model)
-            st.session_state.qa_history.append((user_question, answer))
+            # Repeated questions about the same summary are answered from the session memo; the model
+            # is part of the key since it can be switched between questions
+            key = (selected_model, user_question.strip().lower())
+            if key in st.session_state.qa_memo:
+                answer = st.session_state.qa_memo[key]
+            else:
+                answer_placeholder = st.empty()
+                if st.session_state.passage_index is None and st.session_state.transcript:
+                    st.session_state.passage_index = build_passage_index(st.session_state.transcript)
+                question_context = build_question_context(st.session_state.passage_index, st.session_state.context_message, user_question)
+                try:
+                    answer = asyncio.run(answer_question(question_context, user_question, model=selected_model, placeholder=answer_placeholder))
+                except OpenAIError as e:
+                    answer = None
+                    st.error(f"❌ Could not answer the question: {e}")
+                answer_placeholder.empty()
+                if answer is not None:
+                    st.session_state.qa_memo[key] = answer
+            if answer is not None:
+                st.session_state.qa_history.append((user_question, answer))
 
     for i, (q, a) in enumerate(reversed(st.session_state.qa_history)):
         st.markdown(f"**Q{i+1}:** {q}")
@@ -136,7 +593,11 @@ if st.session_state.qa_active and st.session_state.summary:
     if st.button("✅ Done"):
         st.session_state.qa_active = False
         st.session_state.qa_history.clear()
+        st.session_state.qa_memo.clear()
         st.success("Question & Answer session ended. You can generate a new summary if you like.")
 
+st.sidebar.caption(f"🗄️ LLM cache: {llm_cache.hits} hits / {llm_cache.misses} misses")
+st.sidebar.caption(f"🧭 Semantic cache: {semantic_cache.hits} hits / {semantic_cache.misses} misses")
+
 st.markdown("---")
 st.markdown("Made with ❤️ using Streamlit, OpenAI, and YouTube Transcript API")